@@ -1,194 +1,785 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+import asyncio
+import contextlib
+import fcntl
+import functools
+import glob
 import subprocess
 import uvicorn
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
+import re
+import shutil
 import signal
+import stat
+import threading
+import time
 try:
     import psutil
     PSUTIL_AVAILABLE = True
 except ImportError:
     PSUTIL_AVAILABLE = False
+try:
+    import orjson
+    JSONResponseClass = ORJSONResponse
+    json_dumps = orjson.dumps
+except ImportError:
+    import json
+    JSONResponseClass = JSONResponse
+    def json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+app = FastAPI(default_response_class=JSONResponseClass)
+
+# Background tasks (samplers, stream supervisors). asyncio only keeps weak
+# references to tasks, so hold them here until they finish.
+_background_tasks = set()
+
+# Whether each stream is up. Set when a stream starts (or is adopted) and
+# cleared by its supervisor task when the process exits.
+vinyl_running = False
+cd_running = False
+ADOPTED_POLL_INTERVAL = 2.0
+
+# Persistent MPD connection used by the playback endpoints instead of forking mpc.
+# MPD_HOST is read the way mpc reads it: [password@]host, where host may also
+# be a Unix socket path ('/run/mpd/socket') or an abstract socket ('@mpd').
+def _parse_mpd_host(value):
+    """Split an mpc-style MPD_HOST into (password, host)."""
+    if '@' in value and not value.startswith('@'):
+        password, _, host = value.partition('@')
+        return password, host
+    return None, value
+
+MPD_PASSWORD, MPD_HOST = _parse_mpd_host(os.environ.get('MPD_HOST', 'localhost'))
+MPD_PORT = int(os.environ.get('MPD_PORT', '6600'))
+MPD_TIMEOUT = 2.0
+_mpd = {"reader": None, "writer": None}
+_MPD_LOCK = asyncio.Lock()
+
+# Stream PIDs are also written to disk so a restarted server can adopt an
+# ffmpeg it spawned earlier instead of scanning every process on each request.
+# With several uvicorn workers the PID files (checked with os.kill(pid, 0)) are
+# the shared source of truth, and the lock files stop two workers spawning
+# the same stream at once.
+# They live in a private directory (not world-writable /tmp), set with
+# VINYL_RUN_DIR or defaulting to $XDG_RUNTIME_DIR/vinyl-client, or
+# /run/vinyl-client when running as root.
+def _default_run_dir():
+    if os.environ.get('XDG_RUNTIME_DIR'):
+        return os.path.join(os.environ['XDG_RUNTIME_DIR'], 'vinyl-client')
+    if os.geteuid() == 0:
+        return '/run/vinyl-client'
+    return os.path.expanduser('~/.cache/vinyl-client')
+
+def _ensure_private_dir(path):
+    """Create path as a 0700 directory and refuse one another user could write to."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.geteuid() or st.st_mode & 0o022:
+        raise RuntimeError(f"{path} must be a directory owned by this user and not group/world writable")
+    return path
 
-app = FastAPI()
+RUN_DIR = _ensure_private_dir(os.environ.get('VINYL_RUN_DIR') or _default_run_dir())
+VINYL_PID_FILE = os.path.join(RUN_DIR, 'vinyl.pid')
+CD_PID_FILE = os.path.join(RUN_DIR, 'cd.pid')
+VINYL_LOCK_FILE = os.path.join(RUN_DIR, 'vinyl.lock')
+CD_LOCK_FILE = os.path.join(RUN_DIR, 'cd.lock')
 
-# Store running process references
-vinyl_process = None
-cd_process = None
+# Cache for system info / temperature so frequent polling doesn't re-run psutil
+# and sensor reads on every request. TTLs are in seconds.
+SYS_TTL = float(os.environ.get('SYS_TTL', '2'))
+TEMP_TTL = float(os.environ.get('TEMP_TTL', '1'))
+_SYS_CACHE = {"t": 0.0, "data": None}
+_SYS_LOCK = threading.Lock()
+_TEMP_CACHE = {"t": 0.0, "data": None}
+_TEMP_LOCK = threading.Lock()
+
+# Latest non-blocking CPU usage sample, refreshed by a background task
+CPU_SAMPLE_INTERVAL = 1.0
+_cpu_percent = 0.0
+
+# Values that don't change while the server runs, read once at import
+if PSUTIL_AVAILABLE:
+    _CPU_COUNT = psutil.cpu_count()
+    _BOOT_TIME = datetime.fromtimestamp(psutil.boot_time())
+    _FREQ = psutil.cpu_freq()
+    _FREQ_MIN = round(_FREQ.min, 0) if _FREQ else None
+    _FREQ_MAX = round(_FREQ.max, 0) if _FREQ else None
+    _PROC = psutil.Process(os.getpid())  # for per-process metrics; read under _PROC.oneshot()
+else:
+    _CPU_COUNT = _BOOT_TIME = _FREQ_MIN = _FREQ_MAX = _PROC = None
+
+# Thermal zone files are opened once at startup and re-read with pread.
+# The GPU source is also picked once at startup: a thermal zone whose type
+# names the GPU, or on a Pi (where vcgencmd exists) the SoC sensor in
+# thermal_zone0, which is what 'vcgencmd measure_temp' reports. vcgencmd is
+# only forked at startup, for the GPU memory split, which is fixed at boot.
+THERMAL_PATH = '/sys/class/thermal/thermal_zone0/temp'
+THERMAL_ZONES_GLOB = '/sys/class/thermal/thermal_zone*'
+HWMON_ROOT = '/sys/class/hwmon'
+CORETEMP_GLOB = '/sys/devices/platform/coretemp.*/hwmon/hwmon*/temp*_*'
+_THERMAL_FD = None
+_GPU_THERMAL_FD = None
+_VCGENCMD = shutil.which('vcgencmd')
+_GPU_MEMORY = None
+
+# /proc/meminfo and /proc/uptime are held open the same way and parsed by hand,
+# falling back to psutil where /proc isn't available
+MEMINFO_PATH = '/proc/meminfo'
+UPTIME_PATH = '/proc/uptime'
+_MEMINFO_FD = None
+_UPTIME_FD = None
+
+# The Pi's cores share one clock, so cpu0's current frequency (in kHz) stands
+# in for psutil.cpu_freq(), which reads and averages every core
+CPU_FREQ_PATH = '/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq'
+_CPU_FREQ_FD = None
 
 # CORS Setup (Equivalent to CORS(app))
+# Set CORS_ORIGINS to a comma-separated list of client origins, e.g.
+# "http://192.168.1.21:3431". Without it all origins are allowed.
+CORS_ORIGINS = [o.strip() for o in os.environ.get('CORS_ORIGINS', '*').split(',') if o.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allows all origins
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],  # The only methods the API uses
+    allow_headers=["Content-Type"],
+    max_age=7200,  # Let browsers cache preflights (Chromium's upper limit)
 )
 
-def run_command(cmd: str):
+def spawn_background_task(coro):
+    """Start a task and keep a reference to it until it's done."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def _sample_cpu_percent():
+    """Keep the psutil CPU usage delta fresh without blocking requests."""
+    global _cpu_percent
+    while True:
+        await asyncio.sleep(CPU_SAMPLE_INTERVAL)
+        _cpu_percent = psutil.cpu_percent(interval=None)
+
+@app.on_event('startup')
+async def init_system_info():
+    """Open sensors, read boot-time GPU info and start the CPU usage sampler."""
+    global _GPU_MEMORY, _THERMAL_FD, _GPU_THERMAL_FD, _MEMINFO_FD, _UPTIME_FD, _CPU_FREQ_FD
+    _THERMAL_FD = _open_sysfs(THERMAL_PATH)
+    gpu_path = _find_gpu_thermal_zone()
+    if gpu_path is not None:
+        _GPU_THERMAL_FD = _open_sysfs(gpu_path)
+    elif _VCGENCMD is not None:
+        # Raspberry Pi: the GPU shares the SoC sensor in thermal_zone0
+        _GPU_THERMAL_FD = _THERMAL_FD
+    if _THERMAL_FD is None:
+        # Fall back to the sensor psutil would have reported
+        hwmon_path = _discover_hwmon_temperature_path()
+        if hwmon_path is not None:
+            _THERMAL_FD = _open_sysfs(hwmon_path)
+    _MEMINFO_FD = _open_sysfs(MEMINFO_PATH)
+    _UPTIME_FD = _open_sysfs(UPTIME_PATH)
+    _CPU_FREQ_FD = _open_sysfs(CPU_FREQ_PATH)
+    mem_str = _read_vcgencmd('get_mem', 'gpu')
+    if mem_str is not None:
+        _GPU_MEMORY = mem_str.replace('gpu=', '')
+    if not PSUTIL_AVAILABLE:
+        return
+    psutil.cpu_percent(interval=None)
+    spawn_background_task(_sample_cpu_percent())
+
+@app.on_event('shutdown')
+def close_system_info():
+    """Close the held-open sensor and /proc files."""
+    global _THERMAL_FD, _GPU_THERMAL_FD, _MEMINFO_FD, _UPTIME_FD, _CPU_FREQ_FD
+    # The GPU fd may be the same as the CPU one, so close each fd only once
+    for fd in {_THERMAL_FD, _GPU_THERMAL_FD, _MEMINFO_FD, _UPTIME_FD, _CPU_FREQ_FD}:
+        if fd is not None:
+            os.close(fd)
+    _THERMAL_FD = _GPU_THERMAL_FD = _MEMINFO_FD = _UPTIME_FD = _CPU_FREQ_FD = None
+
+async def run_command(cmd: list[str]):
     """Runs a command where we don't care about the text output."""
     try:
-        subprocess.run(cmd, shell=True, check=True)
-        return True
-    except subprocess.CalledProcessError:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+    except FileNotFoundError:
         return False
+    return await proc.wait() == 0
 
-def get_command_output(cmd: str):
-    """Runs a command and returns the text output as a list of strings."""
-    try:
-        result = subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
-        return result.stdout.strip().split('\n')
-    except subprocess.CalledProcessError:
-        return []
-
-def is_process_running(process):
-    """Check if a process is still running."""
-    if process is None:
+def _mpd_quote(arg):
+    """Quote a command argument for the MPD protocol."""
+    return '"' + arg.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+async def _mpd_connect():
+    """Open a connection to MPD, consume its greeting and send the password."""
+    if MPD_HOST.startswith('/'):
+        reader, writer = await asyncio.open_unix_connection(MPD_HOST)
+    elif MPD_HOST.startswith('@'):
+        reader, writer = await asyncio.open_unix_connection('\0' + MPD_HOST[1:])
+    else:
+        reader, writer = await asyncio.open_connection(MPD_HOST, MPD_PORT)
+    greeting = await reader.readline()
+    if not greeting.startswith(b'OK MPD'):
+        writer.close()
+        raise ConnectionError(f"Unexpected MPD greeting: {greeting!r}")
+    if MPD_PASSWORD is not None:
+        writer.write(b'password ' + _mpd_quote(MPD_PASSWORD).encode() + b'\n')
+        await writer.drain()
+        reply = await reader.readline()
+        if reply != b'OK\n':
+            writer.close()
+            raise ConnectionError(f"MPD rejected the password: {reply!r}")
+    _mpd["reader"], _mpd["writer"] = reader, writer
+
+def _mpd_close():
+    """Drop the MPD connection so the next command reconnects."""
+    if _mpd["writer"] is not None:
+        _mpd["writer"].close()
+    _mpd["reader"] = _mpd["writer"] = None
+
+async def _mpd_exchange(command: str):
+    """Send one command and read response lines up to the closing OK."""
+    if _mpd["writer"] is None:
+        await _mpd_connect()
+    _mpd["writer"].write(command.encode() + b'\n')
+    await _mpd["writer"].drain()
+    lines = []
+    while True:
+        line = await _mpd["reader"].readline()
+        if not line:
+            raise ConnectionError("MPD closed the connection")
+        if line == b'OK\n':
+            return lines
+        if line.startswith(b'ACK'):
+            return None
+        lines.append(line.decode().rstrip('\n'))
+
+async def mpd_command(command: str):
+    """Runs an MPD command and returns its response lines, or None on failure."""
+    async with _MPD_LOCK:
+        # MPD drops idle clients, so retry once on a fresh connection
+        for _ in range(2):
+            try:
+                return await asyncio.wait_for(_mpd_exchange(command), MPD_TIMEOUT)
+            except (OSError, asyncio.TimeoutError):
+                _mpd_close()
+    return None
+
+def format_playlist(lines):
+    """Format playlistinfo output with mpc's default song format.
+
+    That is '[%name%: &[%artist% - ]%title%]|%name%|[%artist% - ]%title%|%file%'.
+    """
+    tracks = []
+    song = None
+    for line in lines:
+        key, _, value = line.partition(': ')
+        if key == 'file':
+            song = {'file': value}
+            tracks.append(song)
+        elif song is not None and key in ('Artist', 'Title', 'Name'):
+            song.setdefault(key, value)
+    result = []
+    for song in tracks:
+        title = None
+        if 'Title' in song:
+            title = f"{song['Artist']} - {song['Title']}" if 'Artist' in song else song['Title']
+        if 'Name' in song and title is not None:
+            result.append(f"{song['Name']}: {title}")
+        elif 'Name' in song:
+            result.append(song['Name'])
+        elif title is not None:
+            result.append(title)
+        else:
+            result.append(song['file'])
+    return result
+
+def is_pid_running(pid):
+    """Check if a process with the given PID is still alive."""
+    if pid is None:
         return False
     try:
-        # Check if process is still alive
-        process.poll()
-        return process.returncode is None
-    except:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
         return False
+    except PermissionError:
+        return True
+
+def write_pid_file(path, pid):
+    """Record a stream PID so it can be adopted after a restart.
+
+    Written to a temp file and renamed into place, never following symlinks.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, 0o600)
+        try:
+            os.write(fd, str(pid).encode())
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+def read_pid_file(path):
+    """Read a stream PID written by write_pid_file, or None."""
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+    except OSError:
+        return None
+    try:
+        return int(os.read(fd, 32).strip())
+    except (OSError, ValueError):
+        return None
+    finally:
+        os.close(fd)
+
+def clear_pid_file(path, pid):
+    """Remove a PID file, unless another process has since replaced it."""
+    if read_pid_file(path) == pid:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+@contextlib.contextmanager
+def stream_lock(path):
+    """Try to take an exclusive lock shared across workers.
+
+    Yields False instead of waiting if another worker (or request) holds it,
+    so the event loop is never blocked.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+        else:
+            yield True
+    finally:
+        os.close(fd)
 
 def find_running_ffmpeg_process(pattern):
-    """Check if an ffmpeg process matching the pattern is already running."""
+    """Return the PID of a running ffmpeg process matching the pattern, or None."""
     if not PSUTIL_AVAILABLE:
-        return False
+        return None
     try:
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+        # Only fetch the name up front; cmdline is read just for ffmpeg processes
+        for proc in psutil.process_iter(['name']):
             try:
                 if proc.info['name'] and 'ffmpeg' in proc.info['name'].lower():
-                    cmdline = ' '.join(proc.info['cmdline'] or [])
-                    if pattern in cmdline:
-                        return True
+                    cmdline = proc.cmdline() or ()
+                    if any(pattern in arg for arg in cmdline):
+                        return proc.pid
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
     except:
         pass
-    return False
+    return None
+
+def is_ffmpeg_pid(pid):
+    """Guard against a stale PID file whose PID was reused by another program."""
+    if not PSUTIL_AVAILABLE:
+        return True
+    try:
+        return 'ffmpeg' in psutil.Process(pid).name().lower()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
 
-# Note: We use standard 'def' (not 'async def') so FastAPI runs these 
-# blocking subprocess calls in a threadpool, keeping the server responsive.
+def is_stream_pid(pid):
+    """Check that a PID from a PID file is alive and still an ffmpeg process."""
+    return is_pid_running(pid) and is_ffmpeg_pid(pid)
+
+def adopt_stream(pid_file, pattern):
+    """Find a stream left running by a previous server instance."""
+    pid = read_pid_file(pid_file)
+    if is_stream_pid(pid):
+        return pid
+    if pid is not None:
+        # Stale: the process is gone or its PID now belongs to something else
+        clear_pid_file(pid_file, pid)
+    pid = find_running_ffmpeg_process(pattern)
+    if pid is not None:
+        write_pid_file(pid_file, pid)
+    return pid
+
+async def _wait_for_pid(pid):
+    """Wait for a process we didn't spawn (so can't reap) to exit."""
+    while is_pid_running(pid):
+        await asyncio.sleep(ADOPTED_POLL_INTERVAL)
+
+async def _supervise_stream(stream, pid_file, pid, *waits):
+    """Clear a stream's running flag and PID file once its processes have exited.
+
+    If the task is cancelled (e.g. at server shutdown) the stream keeps running,
+    so the PID file is left in place for the next server to adopt.
+    """
+    global vinyl_running, cd_running
+    await asyncio.gather(*waits)
+    clear_pid_file(pid_file, pid)
+    if stream == 'vinyl':
+        vinyl_running = False
+    else:
+        cd_running = False
+
+@app.on_event('startup')
+async def adopt_running_streams():
+    """Adopt already-running streams once, so endpoints never need a process scan."""
+    global vinyl_running, cd_running
+    vinyl_pid = adopt_stream(VINYL_PID_FILE, '/vinyl')
+    if vinyl_pid is not None:
+        vinyl_running = True
+        spawn_background_task(_supervise_stream('vinyl', VINYL_PID_FILE, vinyl_pid, _wait_for_pid(vinyl_pid)))
+    cd_pid = adopt_stream(CD_PID_FILE, '/cd')
+    if cd_pid is not None:
+        cd_running = True
+        spawn_background_task(_supervise_stream('cd', CD_PID_FILE, cd_pid, _wait_for_pid(cd_pid)))
+
+# Note: The playback endpoints are 'async def' and talk to MPD (or await the
+# eject subprocess) on the event loop, so they don't tie up a threadpool slot.
 
 @app.post('/eject')
-def eject():
-    run_command('eject')
+async def eject():
+    await run_command(['eject'])
     return {"status": "ejected"}
 
 @app.post('/next')
-def next_track():
-    run_command('mpc next')
+async def next_track():
+    await mpd_command('next')
     return {"status": "skipped"}
 
 @app.post('/prev')
-def prev_track():
-    run_command('mpc prev')
+async def prev_track():
+    await mpd_command('previous')
     return {"status": "previous"}
 
 @app.get('/tracks')
-def list_tracks():
-    tracks = get_command_output('mpc playlist')
-    return {"tracks": tracks}
+async def list_tracks():
+    lines = await mpd_command('playlistinfo')
+    tracks = format_playlist(lines) if lines else []
+    # Returning the response directly skips jsonable_encoder for long playlists
+    return JSONResponseClass({"tracks": tracks})
 
 @app.post('/play')
-def play():
-    run_command('mpc play')
+async def play():
+    await mpd_command('play')
     return {"status": "playing"}
 
 @app.post('/stop')
-def stop():
-    run_command('mpc stop')
+async def stop():
+    await mpd_command('stop')
     return {"status": "stopped"}
 
 @app.post('/pause')
-def pause():
-    run_command('mpc toggle')
+async def pause():
+    # Same as 'mpc toggle': pause when playing, otherwise start playback
+    status = await mpd_command('status')
+    if status is not None and 'state: play' in status:
+        await mpd_command('pause 1')
+    else:
+        await mpd_command('play')
     return {"status": "toggled"}
 
 # Stream Control Endpoints
 
 @app.post('/start_vinyl')
-def start_vinyl():
+async def start_vinyl():
     """Start the vinyl stream if not already running."""
-    global vinyl_process
-    
-    # Check if process is already running
-    if is_process_running(vinyl_process):
-        return {"status": "already_running", "message": "Vinyl stream is already running"}
+    global vinyl_running
     
-    # Check if ffmpeg process for vinyl is already running
-    if find_running_ffmpeg_process('/vinyl'):
+    # Kept up to date by the stream's supervisor task
+    if vinyl_running:
         return {"status": "already_running", "message": "Vinyl stream is already running"}
     
     # Start the vinyl stream
-    cmd = 'ffmpeg -thread_queue_size 4096 -f alsa -ac 2 -ar 48000 -i hw:CARD=Device,DEV=0 -c:a libopus -b:a 64k -vbr off -application lowdelay -af "aresample=async=1000" -rtsp_transport tcp -f rtsp rtsp://localhost:8554/vinyl'
-    try:
-        vinyl_process = subprocess.Popen(
-            cmd,
-            shell=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            preexec_fn=os.setsid  # Create new process group
-        )
-        return {"status": "started", "message": "Vinyl stream started", "pid": vinyl_process.pid}
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to start vinyl stream: {str(e)}"}
+    cmd = [
+        'ffmpeg', '-thread_queue_size', '4096',
+        '-f', 'alsa', '-ac', '2', '-ar', '48000', '-i', 'hw:CARD=Device,DEV=0',
+        '-c:a', 'libopus', '-b:a', '64k', '-vbr', 'off', '-application', 'lowdelay',
+        '-af', 'aresample=async=1000',
+        '-rtsp_transport', 'tcp', '-f', 'rtsp', 'rtsp://localhost:8554/vinyl'
+    ]
+    with stream_lock(VINYL_LOCK_FILE) as acquired:
+        # Another worker may be starting, or already running, the stream
+        if not acquired or is_stream_pid(read_pid_file(VINYL_PID_FILE)):
+            return {"status": "already_running", "message": "Vinyl stream is already running"}
+        try:
+            vinyl_process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+                start_new_session=True  # Create new process group
+            )
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to start vinyl stream: {str(e)}"}
+        write_pid_file(VINYL_PID_FILE, vinyl_process.pid)
+    vinyl_running = True
+    spawn_background_task(_supervise_stream('vinyl', VINYL_PID_FILE, vinyl_process.pid, vinyl_process.wait()))
+    return {"status": "started", "message": "Vinyl stream started", "pid": vinyl_process.pid}
 
 @app.post('/start_cd')
-def start_cd():
+async def start_cd():
     """Start the CD stream if not already running."""
-    global cd_process
-    
-    # Check if process is already running
-    if is_process_running(cd_process):
-        return {"status": "already_running", "message": "CD stream is already running"}
+    global cd_running
     
-    # Check if ffmpeg process for CD is already running
-    if find_running_ffmpeg_process('/cd'):
+    # Kept up to date by the stream's supervisor task
+    if cd_running:
         return {"status": "already_running", "message": "CD stream is already running"}
     
-    # Start the CD stream
-    cmd = 'cdparanoia -d /dev/sr0 -w 1- - | ffmpeg -re -thread_queue_size 4096 -f wav -i - -c:a libopus -b:a 64k -vbr off -application lowdelay -rtsp_transport tcp -f rtsp rtsp://localhost:8554/cd'
-    try:
-        cd_process = subprocess.Popen(
-            cmd,
-            shell=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            preexec_fn=os.setsid  # Create new process group
-        )
-        return {"status": "started", "message": "CD stream started", "pid": cd_process.pid}
-    except Exception as e:
-        return {"status": "error", "message": f"Failed to start CD stream: {str(e)}"}
+    # Start the CD stream: cdparanoia | ffmpeg, wired up without a shell
+    rip_cmd = ['cdparanoia', '-d', '/dev/sr0', '-w', '1-', '-']
+    encode_cmd = [
+        'ffmpeg', '-re', '-thread_queue_size', '4096', '-f', 'wav', '-i', '-',
+        '-c:a', 'libopus', '-b:a', '64k', '-vbr', 'off', '-application', 'lowdelay',
+        '-rtsp_transport', 'tcp', '-f', 'rtsp', 'rtsp://localhost:8554/cd'
+    ]
+    with stream_lock(CD_LOCK_FILE) as acquired:
+        # Another worker may be starting, or already running, the stream
+        if not acquired or is_stream_pid(read_pid_file(CD_PID_FILE)):
+            return {"status": "already_running", "message": "CD stream is already running"}
+        read_fd, write_fd = os.pipe()
+        try:
+            rip_process = await asyncio.create_subprocess_exec(
+                *rip_cmd,
+                stdout=write_fd,
+                stderr=asyncio.subprocess.DEVNULL,
+                start_new_session=True  # Create new process group
+            )
+            try:
+                cd_process = await asyncio.create_subprocess_exec(
+                    *encode_cmd,
+                    stdin=read_fd,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL,
+                    start_new_session=True
+                )
+            except Exception:
+                rip_process.kill()
+                spawn_background_task(rip_process.wait())
+                raise
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to start CD stream: {str(e)}"}
+        finally:
+            # Only the children should hold the pipe, so cdparanoia gets SIGPIPE if ffmpeg exits
+            os.close(read_fd)
+            os.close(write_fd)
+        write_pid_file(CD_PID_FILE, cd_process.pid)
+    cd_running = True
+    spawn_background_task(_supervise_stream('cd', CD_PID_FILE, cd_process.pid, rip_process.wait(), cd_process.wait()))
+    return {
+        "status": "started",
+        "message": "CD stream started",
+        "pid": cd_process.pid,
+        "pids": [rip_process.pid, cd_process.pid]
+    }
 
 # System Information Endpoints
 
+def _open_sysfs(path):
+    """Open a sysfs or /proc file once and keep the fd, or return None if missing."""
+    try:
+        return os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+
+def _read_millidegrees(fd):
+    """Re-read a held-open sysfs temperature file (sysfs regenerates on pread)."""
+    try:
+        return int(os.pread(fd, 16, 0)) / 1000.0
+    except (OSError, ValueError):
+        return None
+
+def _meminfo_kb(buf, key):
+    """Pull one 'Key:   123 kB' value out of raw /proc/meminfo bytes."""
+    start = buf.find(key)
+    if start < 0:
+        return None
+    start += len(key)
+    return int(buf[start:buf.find(b'kB', start)])
+
+def _read_meminfo():
+    """Return (total, available) memory in bytes, or None if unavailable."""
+    if _MEMINFO_FD is None:
+        return None
+    try:
+        buf = os.pread(_MEMINFO_FD, 8192, 0)
+        total = _meminfo_kb(buf, b'MemTotal:')
+        available = _meminfo_kb(buf, b'MemAvailable:')
+    except (OSError, ValueError):
+        return None
+    if total is None or available is None:
+        return None
+    return total * 1024, available * 1024
+
+def _read_uptime():
+    """Return system uptime in seconds from /proc/uptime, or None."""
+    if _UPTIME_FD is None:
+        return None
+    try:
+        buf = os.pread(_UPTIME_FD, 64, 0)
+        return float(buf[:buf.find(b' ')])
+    except (OSError, ValueError):
+        return None
+
+def _read_cpu_freq():
+    """Return the current CPU frequency in MHz, or None."""
+    if _CPU_FREQ_FD is not None:
+        try:
+            return int(os.pread(_CPU_FREQ_FD, 32, 0)) / 1000.0
+        except (OSError, ValueError):
+            pass
+    if not PSUTIL_AVAILABLE:
+        return None
+    try:
+        freq = psutil.cpu_freq()
+    except (OSError, NotImplementedError):
+        return None
+    return freq.current if freq else None
+
+def _hwmon_temperature_bases():
+    """List hwmon 'tempN' base paths in psutil.sensors_temperatures() order."""
+    paths = glob.glob(os.path.join(HWMON_ROOT, 'hwmon*', 'temp*_*'))
+    paths.extend(glob.glob(os.path.join(HWMON_ROOT, 'hwmon*', 'device', 'temp*_*')))
+    # Strip the '_input'/'_label'/... suffix so temp1 sorts before temp10
+    bases = sorted({path.split('_')[0] for path in paths})
+    # coretemp entries are only added if they aren't already under HWMON_ROOT
+    for base in sorted({path.split('_')[0] for path in glob.glob(CORETEMP_GLOB)}):
+        alt = re.sub(r'/sys/devices/platform/coretemp.*/hwmon/', HWMON_ROOT + '/', base)
+        if alt not in bases:
+            bases.append(base)
+    return bases
+
+def _discover_hwmon_temperature_path():
+    """Find the hwmon file behind psutil's first temperature sensor.
+
+    Done once at startup so get_cpu_temperature reads a single file instead of
+    having psutil walk every hwmon sensor on each call.
+    """
+    if not PSUTIL_AVAILABLE:
+        return None
+    try:
+        temps = psutil.sensors_temperatures()
+    except:
+        return None
+    # Get first available temperature sensor
+    for name, entries in temps.items():
+        if entries:
+            label = entries[0].label
+            break
+    else:
+        return None
+    # Walk the sensor files in the same order psutil does, then match the
+    # hwmon device by name and the input by its label file
+    for base in _hwmon_temperature_bases():
+        path = base + '_input'
+        try:
+            with open(os.path.join(os.path.dirname(base), 'name'), 'r') as f:
+                if f.read().strip() != name:
+                    continue
+            sensor_label = ''
+            if os.path.exists(base + '_label'):
+                with open(base + '_label', 'r') as f:
+                    sensor_label = f.read().strip()
+            if sensor_label == label and os.path.exists(path):
+                return path
+        except OSError:
+            continue
+    return None
+
 def get_cpu_temperature():
-    """Get CPU temperature from thermal zone (Raspberry Pi)."""
+    """Get CPU temperature from thermal zone (Raspberry Pi) or hwmon sensor."""
+    if _THERMAL_FD is not None:
+        return _read_millidegrees(_THERMAL_FD)
+    return None
+
+def _read_vcgencmd(*args):
+    """Run vcgencmd and return its stripped output, or None on failure."""
+    if _VCGENCMD is None:
+        return None
     try:
-        # Try Raspberry Pi thermal zone
-        with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-            temp = int(f.read().strip()) / 1000.0  # Convert from millidegrees
-            return temp
-    except (FileNotFoundError, IOError):
-        # Fallback to psutil if available
-        if PSUTIL_AVAILABLE:
-            try:
-                temps = psutil.sensors_temperatures()
-                if temps:
-                    # Get first available temperature sensor
-                    for name, entries in temps.items():
-                        if entries:
-                            return entries[0].current
-            except:
-                pass
+        result = subprocess.run([_VCGENCMD, *args], capture_output=True, text=True, timeout=2)
+        if result.returncode == 0:
+            return result.stdout.strip()
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        pass
+    return None
+
+def _find_gpu_thermal_zone():
+    """Return the temp file of a thermal zone whose type names the GPU, or None."""
+    for zone in sorted(glob.glob(THERMAL_ZONES_GLOB)):
+        try:
+            with open(os.path.join(zone, 'type'), 'r') as f:
+                if 'gpu' in f.read().strip().lower():
+                    return os.path.join(zone, 'temp')
+        except OSError:
+            continue
+    return None
+
+def get_gpu_temperature():
+    """Get GPU temperature from the sensor chosen at startup."""
+    if _GPU_THERMAL_FD is not None:
+        return _read_millidegrees(_GPU_THERMAL_FD)
+    return None
+
+def ttl_cache(ttl_s):
+    """Cache a no-argument function's result for ttl_s seconds.
+
+    The wrapper's updated_at attribute holds the time.monotonic() of the
+    last real call.
+    """
+    def decorator(func):
+        state = {"value": None}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper():
+            with lock:
+                now = time.monotonic()
+                if state["value"] is None or now - wrapper.updated_at >= ttl_s:
+                    state["value"] = func()
+                    wrapper.updated_at = now
+                return state["value"]
+        wrapper.updated_at = 0.0
+        return wrapper
+    return decorator
+
+# Disk usage barely moves, so a statvfs every DISK_TTL seconds is plenty.
+# Its age is reported as disk_age_s, worked out when /system is served.
+DISK_TTL = float(os.environ.get('DISK_TTL', '30'))
+
+@ttl_cache(DISK_TTL)
+def _disk_usage():
+    return psutil.disk_usage('/')
+
+def _cache_lookup(cache, ttl):
+    """Return the cached value if it is younger than ttl seconds, else None."""
+    if cache["data"] is not None and time.monotonic() - cache["t"] < ttl:
+        return cache["data"]
     return None
 
 def get_system_info():
-    """Get comprehensive system information."""
+    """Get comprehensive system information (cached for SYS_TTL seconds)."""
+    with _SYS_LOCK:
+        cached = _cache_lookup(_SYS_CACHE, SYS_TTL)
+        if cached is not None:
+            return cached
+        info = _collect_system_info()
+        _SYS_CACHE["t"] = time.monotonic()
+        _SYS_CACHE["data"] = info
+        return info
+
+def _collect_system_info():
+    """Collect system information without caching."""
     info = {}
     
     # CPU Temperature
@@ -199,16 +790,27 @@ def get_system_info():
     
     # CPU Usage
     if PSUTIL_AVAILABLE:
-        info['cpu_percent'] = round(psutil.cpu_percent(interval=0.1), 1)
-        info['cpu_count'] = psutil.cpu_count()
+        info['cpu_percent'] = round(_cpu_percent, 1)
+        info['cpu_count'] = _CPU_COUNT
+        freq = _read_cpu_freq()
         info['cpu_freq'] = {
-            'current': round(psutil.cpu_freq().current, 0) if psutil.cpu_freq() else None,
-            'min': round(psutil.cpu_freq().min, 0) if psutil.cpu_freq() else None,
-            'max': round(psutil.cpu_freq().max, 0) if psutil.cpu_freq() else None,
+            'current': round(freq, 0) if freq is not None else None,
+            'min': _FREQ_MIN,
+            'max': _FREQ_MAX,
         }
     
     # Memory Usage
-    if PSUTIL_AVAILABLE:
+    meminfo = _read_meminfo()
+    if meminfo is not None:
+        total, available = meminfo
+        used = total - available
+        info['memory'] = {
+            'total': round(total / (1024**3), 2),  # GB
+            'available': round(available / (1024**3), 2),  # GB
+            'used': round(used / (1024**3), 2),  # GB
+            'percent': round(used / total * 100, 1)
+        }
+    elif PSUTIL_AVAILABLE:
         mem = psutil.virtual_memory()
         info['memory'] = {
             'total': round(mem.total / (1024**3), 2),  # GB
@@ -219,7 +821,7 @@ def get_system_info():
     
     # Disk Usage
     if PSUTIL_AVAILABLE:
-        disk = psutil.disk_usage('/')
+        disk = _disk_usage()
         info['disk'] = {
             'total': round(disk.total / (1024**3), 2),  # GB
             'used': round(disk.used / (1024**3), 2),  # GB
@@ -228,9 +830,14 @@ def get_system_info():
         }
     
     # Uptime
-    if PSUTIL_AVAILABLE:
-        boot_time = datetime.fromtimestamp(psutil.boot_time())
-        uptime = datetime.now() - boot_time
+    uptime_s = _read_uptime()
+    if uptime_s is not None:
+        uptime = timedelta(seconds=uptime_s)
+    elif PSUTIL_AVAILABLE:
+        uptime = datetime.now() - _BOOT_TIME
+    else:
+        uptime = None
+    if uptime is not None:
         info['uptime'] = {
             'days': uptime.days,
             'hours': uptime.seconds // 3600,
@@ -250,30 +857,30 @@ def get_system_info():
         }
     
     # GPU Temperature (if available on Pi)
-    try:
-        result = subprocess.run(['vcgencmd', 'measure_temp'], capture_output=True, text=True, timeout=2)
-        if result.returncode == 0:
-            temp_str = result.stdout.strip()
-            gpu_temp = float(temp_str.replace('temp=', '').replace("'C", ''))
-            info['gpu_temperature'] = round(gpu_temp, 1)
-            info['gpu_temperature_unit'] = 'celsius'
-    except (FileNotFoundError, subprocess.TimeoutExpired, ValueError):
-        pass
+    gpu_temp = get_gpu_temperature()
+    if gpu_temp is not None:
+        info['gpu_temperature'] = round(gpu_temp, 1)
+        info['gpu_temperature_unit'] = 'celsius'
     
     # GPU Memory (if available on Pi)
-    try:
-        result = subprocess.run(['vcgencmd', 'get_mem', 'gpu'], capture_output=True, text=True, timeout=2)
-        if result.returncode == 0:
-            mem_str = result.stdout.strip()
-            info['gpu_memory'] = mem_str.replace('gpu=', '')
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        pass
+    if _GPU_MEMORY is not None:
+        info['gpu_memory'] = _GPU_MEMORY
     
     return info
 
-@app.get('/temperature')
 def get_temperature():
-    """Get CPU and GPU temperature."""
+    """Get CPU and GPU temperature (cached for TEMP_TTL seconds)."""
+    with _TEMP_LOCK:
+        cached = _cache_lookup(_TEMP_CACHE, TEMP_TTL)
+        if cached is not None:
+            return cached
+        result = _collect_temperature()
+        _TEMP_CACHE["t"] = time.monotonic()
+        _TEMP_CACHE["data"] = result
+        return result
+
+def _collect_temperature():
+    """Read CPU and GPU temperature without caching."""
     cpu_temp = get_cpu_temperature()
     result = {"cpu_temperature": None, "gpu_temperature": None}
     
@@ -282,32 +889,143 @@ def get_temperature():
         result["cpu_temperature_unit"] = "celsius"
     
     # Try to get GPU temperature (Raspberry Pi)
-    try:
-        gpu_result = subprocess.run(['vcgencmd', 'measure_temp'], capture_output=True, text=True, timeout=2)
-        if gpu_result.returncode == 0:
-            temp_str = gpu_result.stdout.strip()
-            gpu_temp = float(temp_str.replace('temp=', '').replace("'C", ''))
-            result["gpu_temperature"] = round(gpu_temp, 1)
-            result["gpu_temperature_unit"] = "celsius"
-    except (FileNotFoundError, subprocess.TimeoutExpired, ValueError):
-        pass
+    gpu_temp = get_gpu_temperature()
+    if gpu_temp is not None:
+        result["gpu_temperature"] = round(gpu_temp, 1)
+        result["gpu_temperature_unit"] = "celsius"
     
     return result
 
+# Cache hits are served straight from the event loop; misses read sensors
+# and psutil in the default executor so the loop never blocks.
+
+@app.get('/temperature')
+async def temperature():
+    """Get CPU and GPU temperature."""
+    cached = _cache_lookup(_TEMP_CACHE, TEMP_TTL)
+    if cached is not None:
+        return cached
+    return await asyncio.get_running_loop().run_in_executor(None, get_temperature)
+
 @app.get('/system')
-def get_system():
+async def get_system():
     """Get comprehensive system information."""
-    return get_system_info()
+    info = _cache_lookup(_SYS_CACHE, SYS_TTL)
+    if info is None:
+        info = await asyncio.get_running_loop().run_in_executor(None, get_system_info)
+    if 'disk' in info:
+        # Measured now, so it includes time spent in the /system cache
+        info = {**info, 'disk_age_s': round(time.monotonic() - _disk_usage.updated_at, 1)}
+    return JSONResponseClass(info)
+
+# Live metrics stream. A sampler does only the minimum work per tick (read the
+# held-open thermal fd and the latest CPU usage) and pushes a tuple onto
+# metrics_queue; a separate encoder task turns samples into JSON and fans them
+# out to each connected SSE client, so encoding never delays sampling. Both
+# tasks only run while at least one client is connected.
+METRICS_INTERVAL = float(os.environ.get('METRICS_INTERVAL', '1'))
+metrics_queue = None
+_metrics_subscribers = set()
+_metrics_tasks = []
+
+async def _sample_metrics():
+    """Sample (monotonic_ns, cpu_temperature, cpu_percent) at a fixed cadence."""
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
+    while True:
+        cpu_pct = _cpu_percent if PSUTIL_AVAILABLE else None
+        sample = (time.monotonic_ns(), get_cpu_temperature(), cpu_pct)
+        if metrics_queue.full():
+            # Drop the oldest sample rather than stall the sampler
+            metrics_queue.get_nowait()
+        metrics_queue.put_nowait(sample)
+        # Schedule against the ideal timeline so sleep jitter doesn't accumulate
+        next_tick += METRICS_INTERVAL
+        delay = next_tick - loop.time()
+        if delay < 0:
+            next_tick = loop.time()
+            delay = 0
+        await asyncio.sleep(delay)
+
+async def _encode_metrics():
+    """Drain metrics_queue, encode each sample once and fan it out."""
+    while True:
+        t_ns, cpu_temp, cpu_pct = await metrics_queue.get()
+        payload = json_dumps({
+            't_ns': t_ns,
+            'cpu_temperature': round(cpu_temp, 1) if cpu_temp is not None else None,
+            'cpu_percent': round(cpu_pct, 1) if cpu_pct is not None else None
+        })
+        event = b'data: ' + payload + b'\n\n'
+        for subscriber in _metrics_subscribers:
+            if subscriber.full():
+                # Slow client: skip this sample for it
+                continue
+            subscriber.put_nowait(event)
+
+def _start_metrics_tasks():
+    """Start the sampler and encoder for the first connected client."""
+    global metrics_queue
+    metrics_queue = asyncio.Queue(maxsize=16)
+    _metrics_tasks.append(spawn_background_task(_sample_metrics()))
+    _metrics_tasks.append(spawn_background_task(_encode_metrics()))
+
+def _stop_metrics_tasks():
+    """Stop the sampler and encoder once the last client has gone."""
+    for task in _metrics_tasks:
+        task.cancel()
+    _metrics_tasks.clear()
+
+@app.get('/metrics/stream')
+async def metrics_stream():
+    """Stream CPU temperature and usage as Server-Sent Events."""
+    async def events():
+        subscriber = asyncio.Queue(maxsize=16)
+        _metrics_subscribers.add(subscriber)
+        if not _metrics_tasks:
+            _start_metrics_tasks()
+        try:
+            while True:
+                yield await subscriber.get()
+        finally:
+            _metrics_subscribers.discard(subscriber)
+            if not _metrics_subscribers:
+                _stop_metrics_tasks()
+
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache'}
+    )
+
+# Only the timestamp changes between health checks, so the rest of the JSON
+# body is encoded once and the response skips FastAPI's serialization.
+_HEALTH_PREFIX = (
+    b'{"status":"healthy","psutil_available":'
+    + (b'true' if PSUTIL_AVAILABLE else b'false')
+    + b',"timestamp":"'
+)
 
 @app.get('/health')
-def health_check():
+async def health_check():
     """Simple health check endpoint."""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "psutil_available": PSUTIL_AVAILABLE
-    }
+    return Response(
+        _HEALTH_PREFIX + datetime.now().isoformat().encode() + b'"}',
+        media_type="application/json"
+    )
 
 if __name__ == '__main__':
     # Run with: python server.py
-    uvicorn.run(app, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Set WORKERS to spread requests across cores. Each worker is a separate
+    # process with its own /system and /temperature caches, CPU and metrics
+    # samplers, MPD connection and stream adoption, so N workers mean N times
+    # the background polling and fewer cache hits. Stream state is shared
+    # through the PID files. One worker is plenty for a single client on a Pi.
+    uvicorn.run(
+        'server:app',
+        host='0.0.0.0',
+        port=5000,
+        workers=int(os.environ.get('WORKERS', '1')),
+        loop='uvloop',
+        http='httptools'
+    )
\ No newline at end of file